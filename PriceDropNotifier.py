@@ -4,10 +4,1191 @@ import time
 import threading
 import json
 import os
+import math
 from datetime import datetime, timedelta
 import random
 import webbrowser
-from collections import deque
+import uuid
+import queue
+import mmap
+import struct
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple, OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# numpy is optional; without it the observation log falls back to struct
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Local remote-control API
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+DEFAULT_PAGE_SIZE = 50
+# Host headers the API answers to. Anything else is refused, so a web page
+# that rebinds its own domain to 127.0.0.1 still can't reach the API.
+API_ALLOWED_HOSTS = (f"{API_HOST}:{API_PORT}", f"localhost:{API_PORT}")
+MAX_PAGE_SIZE = 500
+
+# Number of products checked in parallel during a sweep
+MAX_FETCH_WORKERS = 8
+
+# Seconds between automatic sweeps (30 minutes)
+CHECK_INTERVAL = 1800
+
+# Seconds on_close waits for in-flight checks before saving and exiting
+SHUTDOWN_DEADLINE = 5
+
+# Changed products are appended to the journal after every sweep; once it
+# holds this many records it is folded back into the main data file
+JOURNAL_FILE = 'tracked_products.journal'
+JOURNAL_COMPACT_LINES = 1000
+
+# Running price statistics are saved alongside the data file, so startup
+# restores them instead of rereading every product's archived history
+STATS_FILE = 'price_stats.json'
+
+# Kinds of change a price check can produce
+CHANGE_PRICE_CHANGED = 'price_changed'
+CHANGE_NEW_LOW = 'new_low'
+CHANGE_TARGET_CROSSED = 'target_crossed'
+CHANGE_TARGET_RECOVERED = 'target_recovered'
+CHANGE_ERROR = 'error'
+
+# A fall of at least this fraction from the previous observed price counts as
+# a price drop, both in the simulated checks and in the analytics
+DROP_THRESHOLD = 0.10
+
+ChangeEvent = namedtuple('ChangeEvent', ['kind', 'product_id', 'old_value', 'new_value'])
+
+# Long-term price archive: every checked price is appended here
+OBSERVATION_DIR = 'observations'
+SEGMENT_RECORDS = 1_000_000  # Records per segment file before rotating (~24 MB)
+
+# Most recent observations listed in the price history window (the chart
+# shows all of them)
+HISTORY_WINDOW_ROWS = 500
+
+
+def downsample_min_max(timestamps, prices, start, end, width):
+    # Reduce a time series to at most two points (the min and the max) per
+    # pixel column so the number of points drawn depends on the plot width
+    if width < 2 or end <= start:
+        return list(zip(timestamps, prices))
+    
+    scale = (width - 1) / (end - start)
+    buckets = {}
+    for t, price in zip(timestamps, prices):
+        column = int((t - start) * scale)
+        bucket = buckets.get(column)
+        if bucket is None:
+            buckets[column] = [(t, price), (t, price)]
+        elif price < bucket[0][1]:
+            bucket[0] = (t, price)
+        elif price > bucket[1][1]:
+            bucket[1] = (t, price)
+    
+    points = []
+    for column in sorted(buckets):
+        low, high = buckets[column]
+        if low[0] == high[0]:
+            points.append(low)
+        else:
+            # Keep the pair in time order so the line doesn't zig-zag backwards
+            points.extend(sorted((low, high)))
+    return points
+
+
+class EventBus:
+    # Fan-out of engine events (price updates, alerts, catalog changes) to any
+    # number of subscribers, each with its own bounded queue. A subscriber that
+    # falls behind loses events instead of blocking the publisher.
+    def __init__(self, max_pending=1000):
+        self.max_pending = max_pending
+        self.subscribers = []
+        self.lock = threading.Lock()
+    
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_pending)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+    
+    def publish(self, event_type, data):
+        event = {
+            'type': event_type,
+            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'data': data
+        }
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                pass
+
+
+def serialize_product(product, fields=None):
+    # JSON-safe copy of a product, optionally projected onto a subset of fields.
+    # The history is left out unless asked for; it has its own endpoint.
+    if fields is None:
+        fields = [key for key in product if key != 'price_history']
+    data = {}
+    for field in fields:
+        if field not in product:
+            continue
+        value = product[field]
+        if isinstance(value, deque):
+            value = list(value)
+        data[field] = value
+    return data
+
+
+def copy_product(product):
+    # Copy deep enough that changing the copy (including appending to its
+    # history) never affects the original
+    product_copy = product.copy()
+    history = product_copy.get('price_history')
+    if isinstance(history, deque):
+        product_copy['price_history'] = deque(history, maxlen=history.maxlen)
+    elif history is not None:
+        product_copy['price_history'] = list(history)
+    return product_copy
+
+
+class ProductStore:
+    # The catalog of tracked products, shared by the GUI, the monitor's fetch
+    # workers and the API threads.
+    #
+    # Product dicts are never modified once they are in the store. Writers copy
+    # a product, change the copy while holding that product's lock, then swap
+    # it in; readers take snapshot(), an immutable tuple they can iterate
+    # without any locking. Changes are published on the event bus.
+    def __init__(self, events):
+        self.events = events
+        self.lock = threading.Lock()  # Guards the catalog itself (add/remove/swap)
+        self.products = {}  # id -> product, in insertion order
+        self.product_locks = {}  # id -> lock serializing updates of one product
+        self.cached_snapshot = ()
+    
+    def load(self, products):
+        # Replace the catalog wholesale, e.g. from the data file at startup
+        with self.lock:
+            self.products = {p['id']: p for p in products}
+            self.product_locks = {product_id: threading.Lock() for product_id in self.products}
+            self.cached_snapshot = None
+    
+    def snapshot(self):
+        snapshot = self.cached_snapshot
+        if snapshot is None:
+            with self.lock:
+                if self.cached_snapshot is None:
+                    self.cached_snapshot = tuple(self.products.values())
+                snapshot = self.cached_snapshot
+        return snapshot
+    
+    def __len__(self):
+        return len(self.products)
+    
+    def get(self, product_id):
+        return self.products.get(product_id)
+    
+    def find_by_url(self, url):
+        return next((p for p in self.snapshot() if p['url'] == url), None)
+    
+    def add(self, product):
+        with self.lock:
+            # Checked under the lock so two concurrent adds can't both succeed
+            if any(p['url'] == product['url'] for p in self.products.values()):
+                raise ValueError("This product is already being tracked")
+            self.products[product['id']] = product
+            self.product_locks[product['id']] = threading.Lock()
+            self.cached_snapshot = None
+        self.events.publish('product_added', serialize_product(product))
+    
+    def remove(self, product_ids):
+        removed = []
+        with self.lock:
+            for product_id in product_ids:
+                product = self.products.pop(product_id, None)
+                if product:
+                    self.product_locks.pop(product_id, None)
+                    removed.append(product)
+            if removed:
+                self.cached_snapshot = None
+        for product in removed:
+            self.events.publish('product_removed', {'id': product['id'], 'name': product['name']})
+        return removed
+    
+    def update(self, product_id, mutator, event_type='product_updated'):
+        # Apply mutator to a private copy of the product and publish the result
+        # (unless event_type is None). Returns the new product, or None if it
+        # isn't (or is no longer) tracked.
+        product_lock = self.product_locks.get(product_id)
+        if product_lock is None:
+            return None
+        
+        with product_lock:
+            current = self.products.get(product_id)
+            if current is None:
+                return None
+            updated = copy_product(current)
+            mutator(updated)
+            
+            with self.lock:
+                if product_id not in self.products:
+                    return None  # Removed while we were working on it
+                self.products[product_id] = updated
+                self.cached_snapshot = None
+        
+        if event_type:
+            self.events.publish(event_type, serialize_product(updated))
+        return updated
+
+
+class ObservationSegment:
+    # One segment file of the observation log. The active (last) segment keeps
+    # an in-memory index of its records; sealed segments are sorted by product
+    # and described by a sidecar file of per-product (first, count) ranges.
+    def __init__(self, path, count=0, start=None, end=None, sealed=False):
+        self.path = path
+        self.count = count
+        self.start = start  # Earliest timestamp in the segment
+        self.end = end  # Latest timestamp in the segment
+        self.sealed = sealed
+        self.positions = {}  # Active: key -> array of record numbers, in time order
+        self.map = None  # Active: writable mmap of the whole file
+    
+    def index_path(self):
+        return self.path + '.idx'
+
+
+class ObservationLog:
+    # Append-only archive of (product, timestamp, price) observations.
+    #
+    # Observations are fixed-width records in segment files of SEGMENT_RECORDS
+    # records each. A segment starts with a 16-byte header (magic + record
+    # count). The active segment is memory-mapped at its full size, so
+    # appending is a copy into the map followed by bumping the count; a record
+    # that was only half written when the process died is never counted.
+    #
+    # When the active segment is full it is sealed: rewritten sorted by product
+    # (each product's records stay in time order) with a small sidecar index
+    # of where each product's records start and how many there are. A bounds
+    # file keeps every product's first and last timestamp over the sealed
+    # segments. Startup only reads that and the sidecar headers, and sealed
+    # segments and their sidecars are loaded on demand (a few at a time), so
+    # neither memory nor open files grow with the size of the archive.
+    #
+    # With numpy installed, sealed segments are sliced as numpy.memmap record
+    # arrays instead of unpacking records one at a time.
+    MAGIC = b'PRICEOBS'
+    INDEX_MAGIC = b'PRICEIDX'
+    HEADER = struct.Struct('<8sQ')  # magic, record count
+    RECORD = struct.Struct('<Qdd')  # product key, unix timestamp, price
+    INDEX_HEADER = struct.Struct('<8sddQ')  # magic, first and last timestamp, number of ranges
+    INDEX_ENTRY = struct.Struct('<QQQ')  # product key, first record, record count
+    BOUNDS_MAGIC = b'PRICEBND'
+    BOUNDS_HEADER = struct.Struct('<8sQQ')  # magic, sealed segments covered, number of entries
+    BOUNDS_ENTRY = struct.Struct('<Qdd')  # product key, first and last timestamp
+    DTYPE = np.dtype([('product', '<u8'), ('timestamp', '<f8'), ('price', '<f8')]) if np else None
+    MAX_OPEN_SEGMENTS = 8  # Sealed segments kept mapped (and sidecars kept loaded) at once
+    
+    def __init__(self, directory, segment_records=SEGMENT_RECORDS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.lock = threading.RLock()
+        self.segments = []  # ObservationSegment, oldest first; the last one is active
+        self.open_maps = OrderedDict()  # segment number -> read-only mmap, least recently used first
+        self.open_ranges = OrderedDict()  # segment number -> sidecar ranges, least recently used first
+        self.bounds = {}  # key -> (first, last) timestamp over the whole log
+        
+        os.makedirs(directory, exist_ok=True)
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.startswith('segment-') and name.endswith('.obs'))
+        for path in paths[:-1]:
+            self.segments.append(self.load_sealed(path))
+        self.load_bounds()
+        if paths:
+            self.segments.append(self.load_active(paths[-1]))
+        else:
+            self.new_segment()
+    
+    @staticmethod
+    def product_key(product_id):
+        # Product ids are uuid4 hex strings; 64 bits of one is plenty as a key
+        return int(product_id[:16], 16)
+    
+    def segment_path(self, number):
+        return os.path.join(self.directory, f"segment-{number:06d}.obs")
+    
+    def bounds_path(self):
+        return os.path.join(self.directory, 'bounds.idx')
+    
+    def read_header(self, path):
+        with open(path, 'rb') as f:
+            magic, count = self.HEADER.unpack(f.read(self.HEADER.size))
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not an observation segment")
+        return count
+    
+    def load_sealed(self, path):
+        segment = ObservationSegment(path, self.read_header(path), sealed=True)
+        try:
+            with open(segment.index_path(), 'rb') as f:
+                magic, segment.start, segment.end, _ = self.INDEX_HEADER.unpack(
+                    f.read(self.INDEX_HEADER.size))
+            if magic != self.INDEX_MAGIC:
+                raise ValueError
+        except (OSError, ValueError, struct.error):
+            # Never sealed: written by an older version, or we died mid-seal
+            self.seal(len(self.segments), segment)
+        return segment
+    
+    def load_active(self, path):
+        segment = ObservationSegment(path, self.read_header(path))
+        with open(path, 'r+b') as f:
+            segment.map = mmap.mmap(f.fileno(), 0)
+        
+        # Index the active segment's records in memory; it holds at most
+        # segment_records of them
+        data = segment.map[self.HEADER.size:self.HEADER.size + segment.count * self.RECORD.size]
+        for i, (key, timestamp, _) in enumerate(self.RECORD.iter_unpack(data)):
+            segment.positions.setdefault(key, array('Q')).append(i)
+            segment.start = timestamp if segment.start is None else min(segment.start, timestamp)
+            segment.end = timestamp if segment.end is None else max(segment.end, timestamp)
+            self.update_bounds(key, timestamp, timestamp)
+        return segment
+    
+    def update_bounds(self, key, first, last):
+        bounds = self.bounds.get(key)
+        self.bounds[key] = (first, last) if bounds is None else (min(bounds[0], first), max(bounds[1], last))
+    
+    def load_bounds(self):
+        # Product bounds over the sealed segments: read from the bounds file,
+        # plus any sealed segments it doesn't cover yet (e.g. we died between
+        # sealing a segment and rewriting the file)
+        covered = 0
+        try:
+            with open(self.bounds_path(), 'rb') as f:
+                magic, covered, entries = self.BOUNDS_HEADER.unpack(f.read(self.BOUNDS_HEADER.size))
+                if magic != self.BOUNDS_MAGIC or covered > len(self.segments):
+                    raise ValueError
+                data = f.read(entries * self.BOUNDS_ENTRY.size)
+            self.bounds = {key: (first, last) for key, first, last in self.BOUNDS_ENTRY.iter_unpack(data)}
+        except (OSError, ValueError, struct.error):
+            covered = 0
+            self.bounds = {}
+        
+        for number in range(covered, len(self.segments)):
+            for key, (first, count) in self.segment_ranges(number).items():
+                self.update_bounds(key, self.read_record(number, first)[1],
+                                   self.read_record(number, first + count - 1)[1])
+        if covered != len(self.segments):
+            self.save_bounds()
+    
+    def save_bounds(self):
+        # Caller holds self.lock (or is __init__), and every segment but the
+        # active one is sealed
+        sealed = sum(1 for segment in self.segments if segment.sealed)
+        with open(self.bounds_path() + '.tmp', 'wb') as f:
+            f.write(self.BOUNDS_HEADER.pack(self.BOUNDS_MAGIC, sealed, len(self.bounds)))
+            for key, (first, last) in self.bounds.items():
+                f.write(self.BOUNDS_ENTRY.pack(key, first, last))
+        os.replace(self.bounds_path() + '.tmp', self.bounds_path())
+    
+    def new_segment(self):
+        path = self.segment_path(len(self.segments) + 1)
+        with open(path, 'w+b') as f:
+            f.truncate(self.HEADER.size + self.segment_records * self.RECORD.size)
+            f.write(self.HEADER.pack(self.MAGIC, 0))
+        self.segments.append(self.load_active(path))
+    
+    def seal(self, number, segment):
+        # Rewrite a segment sorted by product and write its sidecar index. Both
+        # go through temp files, so a crash leaves either the unsealed segment
+        # (sealed again on the next start) or the sealed one.
+        if segment.map is not None:
+            data = segment.map[self.HEADER.size:self.HEADER.size + segment.count * self.RECORD.size]
+            segment.map.close()
+            segment.map = None
+        else:
+            with open(segment.path, 'rb') as f:
+                f.seek(self.HEADER.size)
+                data = f.read(segment.count * self.RECORD.size)
+        
+        if np is not None:
+            records = np.frombuffer(data, dtype=self.DTYPE)
+            records = records[np.argsort(records['product'], kind='stable')]
+            keys, firsts, counts = np.unique(records['product'], return_index=True, return_counts=True)
+            ranges = dict(zip(keys.tolist(), zip(firsts.tolist(), counts.tolist())))
+            timestamps = records['timestamp']
+            start = float(timestamps.min()) if len(records) else float('inf')
+            end = float(timestamps.max()) if len(records) else float('-inf')
+            body = records.tobytes()
+        else:
+            records = sorted(self.RECORD.iter_unpack(data), key=lambda record: record[0])
+            ranges = {}
+            for i, (key, _, _) in enumerate(records):
+                first, count = ranges.get(key, (i, 0))
+                ranges[key] = (first, count + 1)
+            start = min((record[1] for record in records), default=float('inf'))
+            end = max((record[1] for record in records), default=float('-inf'))
+            body = b''.join(self.RECORD.pack(*record) for record in records)
+        
+        with open(segment.path + '.tmp', 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, segment.count))
+            f.write(body)
+        os.replace(segment.path + '.tmp', segment.path)
+        
+        with open(segment.index_path() + '.tmp', 'wb') as f:
+            f.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, start, end, len(ranges)))
+            for key, (first, count) in ranges.items():
+                f.write(self.INDEX_ENTRY.pack(key, first, count))
+        os.replace(segment.index_path() + '.tmp', segment.index_path())
+        
+        segment.sealed = True
+        self.cache_ranges(number, ranges)
+        segment.positions = {}
+        segment.start = start
+        segment.end = end
+        
+        # A map of the unsorted file would now be stale
+        stale = self.open_maps.pop(number, None)
+        if stale is not None:
+            stale.close()
+    
+    def segment_ranges(self, number):
+        # Caller holds self.lock. A sealed segment's sidecar ranges, read on
+        # demand; only the most recently used few are kept.
+        ranges = self.open_ranges.get(number)
+        if ranges is None:
+            with open(self.segments[number].index_path(), 'rb') as f:
+                f.seek(self.INDEX_HEADER.size)
+                data = f.read()
+            ranges = {key: (first, count) for key, first, count in self.INDEX_ENTRY.iter_unpack(data)}
+            self.cache_ranges(number, ranges)
+        else:
+            self.open_ranges.move_to_end(number)
+        return ranges
+    
+    def cache_ranges(self, number, ranges):
+        self.open_ranges[number] = ranges
+        self.open_ranges.move_to_end(number)
+        if len(self.open_ranges) > self.MAX_OPEN_SEGMENTS:
+            self.open_ranges.popitem(last=False)
+    
+    def append(self, product_id, timestamp, price):
+        key = self.product_key(product_id)
+        with self.lock:
+            segment = self.segments[-1]
+            if segment.count >= self.segment_records:
+                # Sealing sorts one segment in memory; it happens once per
+                # segment_records appends
+                self.seal(len(self.segments) - 1, segment)
+                self.save_bounds()
+                self.new_segment()
+                segment = self.segments[-1]
+            
+            count = segment.count
+            self.RECORD.pack_into(segment.map, self.HEADER.size + count * self.RECORD.size,
+                                  key, timestamp, price)
+            # Publish the record only once it is fully written
+            self.HEADER.pack_into(segment.map, 0, self.MAGIC, count + 1)
+            segment.count = count + 1
+            
+            segment.positions.setdefault(key, array('Q')).append(count)
+            segment.start = timestamp if segment.start is None else min(segment.start, timestamp)
+            segment.end = timestamp if segment.end is None else max(segment.end, timestamp)
+            self.update_bounds(key, timestamp, timestamp)
+    
+    def segment_map(self, number):
+        # Caller holds self.lock. Sealed segments are mapped on demand and only
+        # the most recently used few stay open.
+        segment = self.segments[number]
+        if segment.map is not None:
+            return segment.map
+        
+        segment_map = self.open_maps.get(number)
+        if segment_map is None:
+            with open(segment.path, 'rb') as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.open_maps[number] = segment_map
+            if len(self.open_maps) > self.MAX_OPEN_SEGMENTS:
+                self.open_maps.popitem(last=False)[1].close()
+        else:
+            self.open_maps.move_to_end(number)
+        return segment_map
+    
+    def read_record(self, number, i):
+        with self.lock:
+            return self.RECORD.unpack_from(self.segment_map(number), self.HEADER.size + i * self.RECORD.size)
+    
+    def segment_array(self, number):
+        # Zero-copy numpy view of one sealed segment's records (numpy required)
+        segment = self.segments[number]
+        if segment.count == 0:
+            return np.zeros(0, dtype=self.DTYPE)
+        return np.memmap(segment.path, dtype=self.DTYPE, mode='r', offset=self.HEADER.size,
+                         shape=(segment.count,))
+    
+    def bisect_positions(self, number, positions, timestamp, right=False):
+        # Binary search over a product's records (which are in time order),
+        # reading only the O(log n) records it probes
+        lo, hi = 0, len(positions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self.read_record(number, positions[mid])[1]
+            if t < timestamp or (right and t == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def read_positions(self, number, positions, start, end):
+        lo = self.bisect_positions(number, positions, start) if start is not None else 0
+        hi = self.bisect_positions(number, positions, end, right=True) if end is not None else len(positions)
+        positions = positions[lo:hi]
+        
+        if np is not None and len(positions):
+            if isinstance(positions, range):
+                records = self.segment_array(number)[positions.start:positions.stop]
+            else:
+                # Active segment (caller holds self.lock): gather the product's
+                # scattered records out of the writable map in one go. Fancy
+                # indexing copies, so no view of the map outlives this call.
+                segment = self.segments[number]
+                view = np.frombuffer(segment.map, dtype=self.DTYPE, count=segment.count, offset=self.HEADER.size)
+                records = view[np.frombuffer(positions, dtype=np.uint64).astype(np.intp)]
+                del view
+            return records['timestamp'].tolist(), records['price'].tolist()
+        
+        timestamps = []
+        prices = []
+        for position in positions:
+            _, timestamp, price = self.read_record(number, position)
+            timestamps.append(timestamp)
+            prices.append(price)
+        return timestamps, prices
+    
+    def read_segment(self, number, key, start, end):
+        # One product's (timestamps, prices) in one segment, limited to [start, end]
+        segment = self.segments[number]
+        if not segment.sealed:
+            with self.lock:
+                # Hold the lock so the segment can't be sealed (and reordered) under us
+                if not segment.sealed:
+                    return self.read_positions(number, segment.positions.get(key, ()), start, end)
+        
+        with self.lock:
+            entry = self.segment_ranges(number).get(key)
+        if not entry:
+            return [], []
+        first, count = entry
+        return self.read_positions(number, range(first, first + count), start, end)
+    
+    def product_bounds(self, product_id):
+        # (first, last) timestamps recorded for a product, or None
+        with self.lock:
+            return self.bounds.get(self.product_key(product_id))
+    
+    def product_observations(self, product_id, start=None, end=None):
+        # Timestamps and prices recorded for one product, optionally limited
+        # to start <= timestamp <= end. Segments outside the range (or outside
+        # the product's own first..last) are skipped and only the records
+        # inside it are read.
+        key = self.product_key(product_id)
+        bounds = self.product_bounds(product_id)
+        if bounds is None:
+            return [], []
+        start = bounds[0] if start is None else max(start, bounds[0])
+        end = bounds[1] if end is None else min(end, bounds[1])
+        timestamps = []
+        prices = []
+        for number in range(len(self.segments)):
+            segment = self.segments[number]
+            if segment.start is None:
+                continue  # Empty active segment
+            if (start is not None and segment.end < start) or (end is not None and segment.start > end):
+                continue
+            segment_timestamps, segment_prices = self.read_segment(number, key, start, end)
+            timestamps.extend(segment_timestamps)
+            prices.extend(segment_prices)
+        return timestamps, prices
+    
+    def flush(self):
+        # Only the active segment is ever written to
+        with self.lock:
+            if self.segments and self.segments[-1].map is not None:
+                self.segments[-1].map.flush()
+    
+    def close(self):
+        with self.lock:
+            for segment in self.segments:
+                if segment.map is not None:
+                    segment.map.flush()
+                    segment.map.close()
+                    segment.map = None
+            for segment_map in self.open_maps.values():
+                segment_map.close()
+            self.open_maps.clear()
+            self.open_ranges.clear()
+            self.segments = []
+
+
+class ProductStats:
+    # Running aggregates for one product's prices. Each observation updates
+    # them in O(1) amortized time, so nothing ever rescans the history.
+    WINDOWS = {'low_30d': 30 * 86400, 'low_90d': 90 * 86400}
+    STATE_FIELDS = ('version', 'count', 'total', 'low', 'last_timestamp', 'last_price', 'drop_count',
+                    'last_drop', 'change_count', 'change_mean', 'change_m2')
+    
+    def __init__(self):
+        self.version = 0  # Bumped on every observation; memoized summaries check it
+        self.count = 0
+        self.total = 0.0
+        self.low = None
+        self.last_timestamp = None
+        self.last_price = None
+        self.drop_count = 0
+        self.last_drop = None
+        
+        # Welford's running mean/variance of the % change between observations
+        self.change_count = 0
+        self.change_mean = 0.0
+        self.change_m2 = 0.0
+        
+        # Per window, (timestamp, price) pairs with increasing prices; the
+        # front is the window's low once expired entries are dropped
+        self.window_lows = {name: deque() for name in self.WINDOWS}
+    
+    def add(self, timestamp, price):
+        # Observations must arrive in time order; repeats and stragglers are ignored
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+        
+        self.count += 1
+        self.total += price
+        if self.low is None or price < self.low:
+            self.low = price
+        
+        if self.last_price is not None:
+            if price <= self.last_price * (1 - DROP_THRESHOLD):
+                self.drop_count += 1
+                self.last_drop = timestamp
+            if self.last_price:
+                change = (price - self.last_price) / self.last_price * 100
+                self.change_count += 1
+                delta = change - self.change_mean
+                self.change_mean += delta / self.change_count
+                self.change_m2 += delta * (change - self.change_mean)
+        
+        for name, window in self.window_lows.items():
+            while window and window[-1][1] >= price:
+                window.pop()
+            window.append((timestamp, price))
+            self.expire(name, timestamp)
+        
+        self.last_timestamp = timestamp
+        self.last_price = price
+        self.version += 1
+        return True
+    
+    def to_state(self):
+        # JSON-safe snapshot, restored by from_state
+        state = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        state['window_lows'] = {name: list(window) for name, window in self.window_lows.items()}
+        return state
+    
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        for name in cls.STATE_FIELDS:
+            setattr(stats, name, state[name])
+        for name in cls.WINDOWS:
+            stats.window_lows[name] = deque(tuple(entry) for entry in state['window_lows'][name])
+        return stats
+    
+    def expire(self, name, now):
+        window = self.window_lows[name]
+        cutoff = now - self.WINDOWS[name]
+        while window and window[0][0] < cutoff:
+            window.popleft()
+    
+    def window_low(self, name, now):
+        self.expire(name, now)
+        window = self.window_lows[name]
+        return window[0][1] if window else None
+    
+    def expires_at(self):
+        # When a windowed low next changes just because time has passed
+        return min((window[0][0] + self.WINDOWS[name]
+                    for name, window in self.window_lows.items() if window), default=float('inf'))
+    
+    def volatility(self):
+        # Standard deviation of the % change between consecutive observations
+        if self.change_count < 2:
+            return 0.0
+        return (self.change_m2 / (self.change_count - 1)) ** 0.5
+
+
+class PriceAnalytics:
+    # Memoized per-product price statistics. Stats are built lazily the first
+    # time they are asked for, from the state saved by the last session (plus
+    # whatever was observed after it) or else from the product's full history,
+    # then kept up to date by observe(). summary() returns a cached dict until
+    # the product's version changes or a windowed low ages out.
+    def __init__(self, load_history):
+        self.load_history = load_history  # (product, start) -> (timestamps, prices) from start on, oldest first
+        self.lock = threading.Lock()
+        self.stats = {}  # product id -> ProductStats
+        self.saved = {}  # product id -> saved ProductStats state not restored yet
+        self.memo = {}  # product id -> (version, valid until, summary)
+    
+    def restore(self, states):
+        with self.lock:
+            self.saved = dict(states)
+    
+    def state(self):
+        # Everything worth saving: live stats plus saved ones not needed yet
+        with self.lock:
+            states = dict(self.saved)
+            states.update((product_id, stats.to_state()) for product_id, stats in self.stats.items())
+            return states
+    
+    def observe(self, product_id, timestamp, price):
+        with self.lock:
+            stats = self.stats.get(product_id)
+            if stats is not None:  # Unseeded products pick it up from the history later
+                stats.add(timestamp, price)
+    
+    def forget(self, product_id):
+        with self.lock:
+            self.stats.pop(product_id, None)
+            self.saved.pop(product_id, None)
+            self.memo.pop(product_id, None)
+    
+    def catch_up(self, product, stats):
+        # Feed stats everything in the history after the last price they saw
+        start = stats.last_timestamp if stats.last_timestamp is not None else float('-inf')
+        for timestamp, price in zip(*self.load_history(product, start)):
+            stats.add(timestamp, price)
+    
+    def get_stats(self, product):
+        product_id = product['id']
+        with self.lock:
+            stats = self.stats.get(product_id)
+            if stats is not None:
+                return stats
+            saved = self.saved.pop(product_id, None)
+        
+        # Built without holding the lock, so a long history doesn't stall
+        # observe() (and every other product's summary) in the meantime
+        try:
+            stats = ProductStats.from_state(saved) if saved else ProductStats()
+        except (KeyError, TypeError, ValueError):
+            stats = ProductStats()  # Unreadable saved state: rebuild from the history
+        self.catch_up(product, stats)
+        
+        with self.lock:
+            if product_id in self.stats:
+                return self.stats[product_id]  # Another thread built them first
+            # observe() skipped this product until now; pick up what it missed
+            self.catch_up(product, stats)
+            self.stats[product_id] = stats
+            return stats
+    
+    def summary(self, product):
+        product_id = product['id']
+        stats = self.get_stats(product)
+        now = time.time()
+        with self.lock:
+            memo = self.memo.get(product_id)
+            if memo and memo[0] == stats.version and now < memo[1]:
+                return memo[2]
+            
+            summary = {
+                'count': stats.count,
+                'all_time_low': stats.low,
+                'low_30d': stats.window_low('low_30d', now),
+                'low_90d': stats.window_low('low_90d', now),
+                'average': stats.total / stats.count if stats.count else None,
+                'volatility': stats.volatility(),
+                'drop_count': stats.drop_count,
+                'last_drop': (datetime.fromtimestamp(stats.last_drop).strftime("%Y-%m-%d")
+                              if stats.last_drop is not None else None)
+            }
+            self.memo[product_id] = (stats.version, stats.expires_at(), summary)
+            return summary
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    # Routes:
+    #   GET    /products?offset=&limit=&fields=a,b   list tracked products
+    #   POST   /products                             add {url, name, target_price}
+    #   GET    /products/<id>?fields=a,b             one product
+    #   DELETE /products/<id>                        stop tracking a product
+    #   GET    /products/<id>/history?offset=&limit=&start=&end=
+    #                                                price history incl. the archive, oldest first
+    #   GET    /products/<id>/stats                  lows, average, volatility, drops
+    #   GET    /events                               server-sent event stream
+    #   GET    /monitor                              monitor state
+    #   POST   /monitor/pause|resume|check           control the monitor
+    server_version = "PriceTrackerAPI/1.0"
+    
+    @property
+    def tracker(self):
+        return self.server.tracker
+    
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet; the GUI has its own status bar
+    
+    def send_json(self, status, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_error_json(self, status, message):
+        self.send_json(status, {'error': message})
+    
+    def check_host(self):
+        # DNS rebinding lets a page reach us as same-origin, but its requests
+        # still carry its own domain in the Host header
+        if self.headers.get('Host', '').strip().lower() not in API_ALLOWED_HOSTS:
+            self.send_error_json(403, "Host not allowed")
+            return False
+        return True
+    
+    def parse_request_path(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        return parts, parse_qs(parsed.query)
+    
+    def get_page(self, query):
+        try:
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', [str(DEFAULT_PAGE_SIZE)])[0])
+        except ValueError:
+            raise ValueError("offset and limit must be integers")
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be >= 0 and limit must be >= 1")
+        return offset, min(limit, MAX_PAGE_SIZE)
+    
+    def get_time_range(self, query):
+        try:
+            start = float(query.get('start', ['-inf'])[0])
+            end = float(query.get('end', ['inf'])[0])
+        except ValueError:
+            raise ValueError("start and end must be unix timestamps")
+        if math.isnan(start) or math.isnan(end):
+            raise ValueError("start and end must be unix timestamps")
+        return start, end
+    
+    def get_fields(self, query):
+        if 'fields' not in query:
+            return None
+        return [f for f in query['fields'][0].split(',') if f]
+    
+    def do_GET(self):
+        if not self.check_host():
+            return
+        parts, query = self.parse_request_path()
+        try:
+            if parts == ['products']:
+                offset, limit = self.get_page(query)
+                products = self.tracker.store.snapshot()
+                fields = self.get_fields(query)
+                self.send_json(200, {
+                    'items': [serialize_product(p, fields) for p in products[offset:offset + limit]],
+                    'total': len(products),
+                    'offset': offset,
+                    'limit': limit
+                })
+            elif len(parts) == 2 and parts[0] == 'products':
+                product = self.tracker.get_product(parts[1])
+                if not product:
+                    self.send_error_json(404, "Product not found")
+                    return
+                self.send_json(200, serialize_product(product, self.get_fields(query)))
+            elif len(parts) == 3 and parts[0] == 'products' and parts[2] == 'history':
+                product = self.tracker.get_product(parts[1])
+                if not product:
+                    self.send_error_json(404, "Product not found")
+                    return
+                offset, limit = self.get_page(query)
+                start, end = self.get_time_range(query)
+                timestamps, prices = self.tracker.get_history_range(product, start, end)
+                self.send_json(200, {
+                    'items': self.tracker.history_entries(timestamps, prices, offset,
+                                                          min(offset + limit, len(prices))),
+                    'total': len(prices),
+                    'offset': offset,
+                    'limit': limit
+                })
+            elif len(parts) == 3 and parts[0] == 'products' and parts[2] == 'stats':
+                product = self.tracker.get_product(parts[1])
+                if not product:
+                    self.send_error_json(404, "Product not found")
+                    return
+                self.send_json(200, self.tracker.analytics.summary(product))
+            elif parts == ['events']:
+                self.stream_events()
+            elif parts == ['monitor']:
+                self.send_json(200, {'paused': self.tracker.monitor_paused})
+            else:
+                self.send_error_json(404, "Not found")
+        except ValueError as e:
+            self.send_error_json(400, str(e))
+    
+    def do_POST(self):
+        if not self.check_host():
+            return
+        parts, _ = self.parse_request_path()
+        
+        # Requiring a JSON content type means a browser must send a CORS
+        # preflight (which we never answer) before a cross-origin page can
+        # POST here; check_host covers pages that make themselves same-origin
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_error_json(415, "Content-Type must be application/json")
+            return
+        
+        if len(parts) == 2 and parts[0] == 'monitor':
+            actions = {
+                'pause': self.tracker.pause_monitoring,
+                'resume': self.tracker.resume_monitoring,
+                'check': self.tracker.check_now
+            }
+            if parts[1] not in actions:
+                self.send_error_json(404, "Not found")
+                return
+            actions[parts[1]]()
+            self.send_json(202, {'paused': self.tracker.monitor_paused})
+            return
+        
+        if parts != ['products']:
+            self.send_error_json(404, "Not found")
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            url = body.get('url', '')
+            name = body.get('name', '')
+            target_price = body.get('target_price')
+            if not isinstance(url, str) or not isinstance(name, str):
+                raise ValueError("url and name must be strings")
+            if isinstance(target_price, bool) or not isinstance(target_price, (int, float)):
+                raise ValueError("target_price must be a number")
+            product = self.tracker.create_product(url, name, target_price)
+        except ValueError as e:  # Also covers malformed JSON
+            self.send_error_json(400, str(e))
+            return
+        
+        # Tk widgets may only be touched from the GUI thread
+        self.tracker.root.after(0, self.tracker.refresh_product_views)
+        if product['status'] == "Target Reached!":
+            self.tracker.root.after(0, self.tracker.show_alert, product)
+        self.send_json(201, serialize_product(product))
+    
+    def do_DELETE(self):
+        if not self.check_host():
+            return
+        parts, _ = self.parse_request_path()
+        if len(parts) != 2 or parts[0] != 'products':
+            self.send_error_json(404, "Not found")
+            return
+        
+        if not self.tracker.remove_products([parts[1]]):
+            self.send_error_json(404, "Product not found")
+            return
+        self.tracker.root.after(0, self.tracker.refresh_product_views)
+        self.send_json(204)
+    
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        subscriber = self.tracker.events.subscribe()
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps idle connections (and proxies) alive
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                message = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+        finally:
+            self.tracker.events.unsubscribe(subscriber)
+
+
+class PriceChart:
+    # Line chart of a product's price history drawn on a Tk Canvas. Zooming
+    # and panning only change the visible time range; each redraw fetches that
+    # range from the tracker and downsamples it to the canvas width.
+    PADDING_LEFT = 80
+    PADDING_RIGHT = 20
+    PADDING_TOP = 20
+    PADDING_BOTTOM = 40
+    MIN_SPAN = 3600  # Don't zoom in further than one hour
+    
+    def __init__(self, parent, tracker, product):
+        self.tracker = tracker
+        self.product = product
+        
+        self.full_start, self.full_end = tracker.get_history_bounds(product)
+        if self.full_end - self.full_start < self.MIN_SPAN:
+            self.full_start -= 86400
+            self.full_end += 86400
+        self.view_start = self.full_start
+        self.view_end = self.full_end
+        
+        self.drag_x = None
+        self.redraw_pending = False
+        
+        self.canvas = tk.Canvas(parent, background="#ffffff", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(e.x, 0.8 if e.delta > 0 else 1.25))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(e.x, 0.8))  # X11 scroll up
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(e.x, 1.25))  # X11 scroll down
+        self.canvas.bind("<ButtonPress-1>", self.start_pan)
+        self.canvas.bind("<B1-Motion>", self.pan)
+        self.canvas.bind("<Double-1>", lambda e: self.reset_view())
+    
+    def plot_width(self):
+        return max(self.canvas.winfo_width() - self.PADDING_LEFT - self.PADDING_RIGHT, 1)
+    
+    def plot_height(self):
+        return max(self.canvas.winfo_height() - self.PADDING_TOP - self.PADDING_BOTTOM, 1)
+    
+    def set_view(self, start, end):
+        # Clamp the view to the available history, keeping its span if possible
+        span = min(max(end - start, self.MIN_SPAN), self.full_end - self.full_start)
+        start = min(max(start, self.full_start), self.full_end - span)
+        self.view_start = start
+        self.view_end = start + span
+        self.schedule_redraw()
+    
+    def zoom(self, x, factor):
+        # Zoom around the time under the mouse cursor
+        fraction = min(max((x - self.PADDING_LEFT) / self.plot_width(), 0), 1)
+        span = self.view_end - self.view_start
+        anchor = self.view_start + span * fraction
+        new_span = span * factor
+        self.set_view(anchor - new_span * fraction, anchor + new_span * (1 - fraction))
+    
+    def start_pan(self, event):
+        self.drag_x = event.x
+    
+    def pan(self, event):
+        if self.drag_x is None:
+            return
+        span = self.view_end - self.view_start
+        shift = (self.drag_x - event.x) / self.plot_width() * span
+        self.drag_x = event.x
+        self.set_view(self.view_start + shift, self.view_end + shift)
+    
+    def reset_view(self):
+        self.set_view(self.full_start, self.full_end)
+    
+    def schedule_redraw(self):
+        # Coalesce bursts of resize/zoom/pan events into a single redraw
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.canvas.after_idle(self.redraw)
+    
+    def redraw(self):
+        self.redraw_pending = False
+        if not self.canvas.winfo_exists():
+            return
+        
+        self.canvas.delete("all")
+        width = self.plot_width()
+        height = self.plot_height()
+        left = self.PADDING_LEFT
+        top = self.PADDING_TOP
+        bottom = top + height
+        
+        timestamps, prices = self.tracker.get_history_range(self.product, self.view_start, self.view_end)
+        points = downsample_min_max(timestamps, prices, self.view_start, self.view_end, width)
+        
+        # Axes
+        self.canvas.create_line(left, top, left, bottom, fill="#999999")
+        self.canvas.create_line(left, bottom, left + width, bottom, fill="#999999")
+        
+        start_label = datetime.fromtimestamp(self.view_start).strftime("%Y-%m-%d")
+        end_label = datetime.fromtimestamp(self.view_end).strftime("%Y-%m-%d")
+        self.canvas.create_text(left, bottom + 15, text=start_label, anchor=tk.NW, font=('Segoe UI', 9))
+        self.canvas.create_text(left + width, bottom + 15, text=end_label, anchor=tk.NE, font=('Segoe UI', 9))
+        
+        if not points:
+            self.canvas.create_text(left + width // 2, top + height // 2, text="No data in this range",
+                                    font=('Segoe UI', 10), fill="#666666")
+            return
+        
+        low = min(p for _, p in points)
+        high = max(p for _, p in points)
+        if high - low < 0.01:
+            low -= 1
+            high += 1
+        
+        self.canvas.create_text(left - 5, top, text=f"${high:,.2f}", anchor=tk.NE, font=('Segoe UI', 9))
+        self.canvas.create_text(left - 5, bottom, text=f"${low:,.2f}", anchor=tk.SE, font=('Segoe UI', 9))
+        
+        x_scale = width / (self.view_end - self.view_start)
+        y_scale = height / (high - low)
+        
+        def to_canvas(t, price):
+            return left + (t - self.view_start) * x_scale, bottom - (price - low) * y_scale
+        
+        # Target price line, if it falls inside the visible price range
+        target = self.product.get('target_price')
+        if target is not None and low <= target <= high:
+            _, y = to_canvas(self.view_start, target)
+            self.canvas.create_line(left, y, left + width, y, fill=self.tracker.success_color, dash=(4, 2))
+            self.canvas.create_text(left + width, y - 2, text="Target", anchor=tk.SE,
+                                    font=('Segoe UI', 8), fill=self.tracker.success_color)
+        
+        coords = []
+        for t, price in points:
+            coords.extend(to_canvas(t, price))
+        
+        if len(points) > 1:
+            self.canvas.create_line(*coords, fill=self.tracker.primary_color, width=2)
+        
+        # Mark individual observations when there is room to see them
+        if len(points) <= width // 8:
+            for i in range(0, len(coords), 2):
+                x, y = coords[i], coords[i + 1]
+                self.canvas.create_oval(x - 3, y - 3, x + 3, y + 3,
+                                        fill=self.tracker.secondary_color, outline="")
+
 
 class AmazonPriceTracker:
     def __init__(self, root):
@@ -27,18 +1208,39 @@ class AmazonPriceTracker:
         self.set_style()
         
         # Product tracking list with price history
-        self.tracked_products = []
+        self.events = EventBus()
+        self.store = ProductStore(self.events)
+        self.history_cache = {}  # url -> (history signature, precomputed series)
+        self.history_cutoffs = {}  # product id -> start of the archive's first day
+        self.save_lock = threading.Lock()
+        self.journal_lines = 0
+        self.observation_log = None
+        self.analytics = PriceAnalytics(
+            lambda product, start: self.get_history_range(product, start, float('inf')))
+        
+        # Monitor controls. The monitor thread waits on a command queue, so
+        # pause/resume/check-now/stop wake it immediately instead of after a sleep.
+        self.monitor_commands = queue.Queue()
+        self.monitor_paused = False
+        self.stop_event = threading.Event()
+        self.inflight_checks = 0
+        self.inflight_changed = threading.Condition()
         self.user_info = {'email': '', 'phone': ''}
         self.load_data()
+        self.open_observation_log()
         
         # Create GUI elements
         self.create_widgets()
         
         # Start background monitoring thread
-        self.monitoring_active = True
+        self.fetch_pool = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="price-fetch")
         self.monitor_thread = threading.Thread(target=self.monitor_prices, daemon=True)
         self.monitor_thread.start()
         
+        # Serve the remote-control API alongside the GUI
+        self.api_server = None
+        self.start_api_server()
+        
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
@@ -175,6 +1377,9 @@ class AmazonPriceTracker:
         self.products_tree.column("status", width=150, stretch=tk.NO, anchor=tk.CENTER)
         self.products_tree.column("url", width=250, stretch=tk.YES, anchor=tk.W)
         
+        self.products_tree.tag_configure('target_reached', background='#d4edda')
+        self.products_tree.tag_configure('price_drop', background='#fff3cd')
+        
         # Add scrollbars
         y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.products_tree.yview)
         x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.products_tree.xview)
@@ -196,6 +1401,10 @@ class AmazonPriceTracker:
                                   style='Success.TButton')
         refresh_button.pack(side=tk.LEFT, padx=5)
         
+        self.pause_button = ttk.Button(buttons_frame, text="⏸ Pause Monitoring",
+                                       command=self.toggle_monitoring)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        
         remove_button = ttk.Button(buttons_frame, text="❌ Remove Selected", command=self.remove_product,
                                   style='Danger.TButton')
         remove_button.pack(side=tk.LEFT, padx=5)
@@ -207,12 +1416,16 @@ class AmazonPriceTracker:
                                   style='Info.TButton')
         history_button.pack(side=tk.LEFT, padx=5)
         
+        chart_button = ttk.Button(buttons_frame, text="📈 Price Chart", command=self.show_price_chart,
+                                style='Info.TButton')
+        chart_button.pack(side=tk.LEFT, padx=5)
+        
         # Stats frame
         stats_frame = ttk.Frame(buttons_frame)
         stats_frame.pack(side=tk.RIGHT, padx=5)
         
         self.tracking_count = tk.StringVar()
-        self.tracking_count.set(f"Tracking: {len(self.tracked_products)} products")
+        self.tracking_count.set(f"Tracking: {len(self.store)} products")
         stats_label = ttk.Label(stats_frame, textvariable=self.tracking_count, 
                                font=('Segoe UI', 9), foreground="#666666")
         stats_label.pack(side=tk.RIGHT)
@@ -309,36 +1522,32 @@ class AmazonPriceTracker:
         popup.destroy()
         self.show_success_message("Notification settings saved successfully!")
     
-    def add_product(self):
-        url = self.url_entry.get().strip()
-        name = self.name_entry.get().strip()
-        target_price = self.target_price_entry.get().strip()
+    def create_product(self, url, name, target_price):
+        # Validate and start tracking a product. Shared by the GUI and the API,
+        # so problems are raised as ValueError rather than shown in a dialog.
+        url = str(url).strip()
+        name = str(name).strip()
         
-        if not url or not name or not target_price:
-            messagebox.showerror("Error", "Please fill in all fields", parent=self.root)
-            return
+        if not url or not name or str(target_price).strip() == '':
+            raise ValueError("Please fill in all fields")
         
         try:
+            if isinstance(target_price, bool):
+                raise ValueError
             target_price = float(target_price)
-            if target_price <= 0:
+            # float() also accepts "nan" and "inf", which aren't prices (and NaN isn't valid JSON)
+            if not math.isfinite(target_price) or target_price <= 0:
                 raise ValueError
-        except ValueError:
-            messagebox.showerror("Error", "Target price must be a positive number", parent=self.root)
-            return
+        except (TypeError, ValueError):
+            raise ValueError("Target price must be a positive number")
         
         # Check if URL already exists
-        for product in self.tracked_products:
-            if product['url'] == url:
-                messagebox.showerror("Error", "This product is already being tracked", parent=self.root)
-                return
+        if self.store.find_by_url(url):
+            raise ValueError("This product is already being tracked")
         
         # Generate random current price between 10000 and 18000
         current_price = random.uniform(10000, 25000)
         
-        # Generate random last price drop date (within last 6 months)
-        days_ago = random.randint(1, 180)
-        last_drop_date = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
-        
         # Create price history with 3-5 entries
         price_history = deque(maxlen=5)
         for i in range(random.randint(3, 5)):
@@ -352,20 +1561,51 @@ class AmazonPriceTracker:
             })
         
         product = {
+            'id': uuid.uuid4().hex,
             'name': name,
             'url': url,
             'current_price': current_price,
-            'lowest_price': current_price * random.uniform(0.7, 0.95),  # Random lower price
             'target_price': target_price,
-            'last_drop_date': last_drop_date,
             'status': "Tracking" if current_price > target_price else "Target Reached!",
             'last_checked': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'price_history': list(price_history)
         }
         
-        self.tracked_products.append(product)
+        self.store.add(product)
+        # Only archived once the add has won against any concurrent one
+        self.record_observation(product)
         self.save_data()
+        return product
+    
+    def remove_products(self, product_ids):
+        # Stop tracking the given products; returns the ones actually removed
+        removed = self.store.remove(product_ids)
+        if not removed:
+            return []
+        
+        self.save_data()
+        for product in removed:
+            self.history_cache.pop(product['url'], None)
+            self.history_cutoffs.pop(product['id'], None)
+            self.analytics.forget(product['id'])
+        return removed
+    
+    def get_product(self, product_id):
+        return self.store.get(product_id)
+    
+    def refresh_product_views(self):
         self.update_products_tree()
+        self.tracking_count.set(f"Tracking: {len(self.store)} products")
+    
+    def add_product(self):
+        try:
+            product = self.create_product(self.url_entry.get(), self.name_entry.get(),
+                                          self.target_price_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.root)
+            return
+        
+        name = product['name']
         
         # Clear form
         self.url_entry.delete(0, tk.END)
@@ -374,7 +1614,7 @@ class AmazonPriceTracker:
         
         # Update status
         self.status_var.set(f"Added product: {name} | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        self.tracking_count.set(f"Tracking: {len(self.tracked_products)} products")
+        self.refresh_product_views()
         
         # Show success message
         self.show_success_message(f"Product '{name}' added successfully!")
@@ -452,20 +1692,17 @@ class AmazonPriceTracker:
                                  parent=self.root):
             return
         
-        products_to_remove = [self.products_tree.item(item)['values'][0] for item in selected]
-        self.tracked_products = [p for p in self.tracked_products if p['name'] not in products_to_remove]
-        self.save_data()
-        self.update_products_tree()
+        # Tree rows are keyed by product id
+        removed = self.remove_products(selected)
+        self.refresh_product_views()
         
         # Update status
-        if len(products_to_remove) == 1:
-            self.status_var.set(f"Removed product: {products_to_remove[0]} | " + 
+        if len(removed) == 1:
+            self.status_var.set(f"Removed product: {removed[0]['name']} | " + 
                               datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         else:
-            self.status_var.set(f"Removed {len(products_to_remove)} products | " + 
+            self.status_var.set(f"Removed {len(removed)} products | " + 
                               datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        
-        self.tracking_count.set(f"Tracking: {len(self.tracked_products)} products")
     
     def open_in_browser(self, event=None):
         selected = self.products_tree.selection()
@@ -483,25 +1720,136 @@ class AmazonPriceTracker:
         except Exception as e:
             messagebox.showerror("Error", f"Could not open browser: {str(e)}", parent=self.root)
     
-    def show_price_history(self):
+    def get_selected_product(self, action):
         selected = self.products_tree.selection()
         if not selected:
-            messagebox.showerror("Error", "Please select a product to view history", parent=self.root)
-            return
-        
-        item = self.products_tree.item(selected[0])
-        product_name = item['values'][0]
+            messagebox.showerror("Error", f"Please select a product to {action}", parent=self.root)
+            return None
         
-        # Find the product in our list
-        product = next((p for p in self.tracked_products if p['name'] == product_name), None)
-        if not product or 'price_history' not in product:
+        product = self.get_product(selected[0])
+        if not product or not product.get('price_history'):
             messagebox.showinfo("Info", "No price history available for this product", parent=self.root)
+            return None
+        return product
+    
+    def get_history_series(self, product):
+        # Sorted timestamps and prices for a product's saved history. The
+        # series is cached and only rebuilt when the history itself changes.
+        history = product.get('price_history') or []
+        if history:
+            last = history[-1]
+            signature = (len(history), last['date'], last['price'])
+        else:
+            signature = (0,)
+        
+        cached = self.history_cache.get(product['url'])
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        # ISO dates sort correctly as strings, so no parsing is needed to order them
+        records = sorted(history, key=lambda x: x['date'])
+        timestamps = [datetime.fromisoformat(r['date']).timestamp() for r in records]
+        prices = [r['price'] for r in records]
+        
+        series = {
+            'timestamps': timestamps,
+            'prices': prices
+        }
+        self.history_cache[product['url']] = (signature, series)
+        return series
+    
+    def saved_history_cutoff(self, product):
+        # Saved history entries only have a date, and every price they record
+        # is also archived at its real time. Entries from the archive's first
+        # day onwards are therefore left out in favour of the archive.
+        archived = self.observation_log.product_bounds(product['id']) if self.observation_log else None
+        if not archived:
+            return float('inf'), None
+        # The first archived timestamp never changes, so neither does the cutoff
+        cutoff = self.history_cutoffs.get(product['id'])
+        if cutoff is None:
+            first_day = datetime.fromtimestamp(archived[0]).replace(hour=0, minute=0, second=0, microsecond=0)
+            cutoff = self.history_cutoffs[product['id']] = first_day.timestamp()
+        return cutoff, archived
+    
+    def get_history_bounds(self, product):
+        # Earliest and latest timestamps across the saved history and the archive
+        cutoff, archived = self.saved_history_cutoff(product)
+        timestamps = self.get_history_series(product)['timestamps']
+        timestamps = timestamps[:bisect_left(timestamps, cutoff)]
+        bounds = [timestamps[0], timestamps[-1]] if timestamps else []
+        if archived:
+            bounds.extend(archived)
+        if not bounds:
+            now = time.time()
+            return now, now
+        return min(bounds), max(bounds)
+    
+    def get_history_range(self, product, start, end):
+        # Observations with start <= timestamp <= end: the saved history
+        # (located by binary search) up to the archive's cutoff, followed by
+        # the archived observations
+        cutoff, archived = self.saved_history_cutoff(product)
+        series = self.get_history_series(product)
+        timestamps = series['timestamps']
+        lo = bisect_left(timestamps, start)
+        hi = min(bisect_right(timestamps, end), bisect_left(timestamps, cutoff))
+        saved_timestamps, saved_prices = timestamps[lo:hi], series['prices'][lo:hi]
+        if not archived:
+            return saved_timestamps, saved_prices
+        
+        # Everything kept from the saved history predates the archive
+        archived_timestamps, archived_prices = self.observation_log.product_observations(product['id'], start, end)
+        return saved_timestamps + archived_timestamps, saved_prices + archived_prices
+    
+    def history_entries(self, timestamps, prices, lo, hi):
+        # Entries lo..hi-1 of a history from get_history_range, each with its
+        # change from the entry before it
+        entries = []
+        for i in range(lo, hi):
+            previous = prices[i - 1] if i else None
+            change = prices[i] - previous if previous is not None else None
+            entries.append({
+                'timestamp': timestamps[i],
+                'date': datetime.fromtimestamp(timestamps[i]).strftime("%Y-%m-%d %H:%M:%S"),
+                'price': prices[i],
+                'change': change,
+                'change_percent': (change / previous * 100 if previous else 0.0) if change is not None else None
+            })
+        return entries
+    
+    def show_price_history(self):
+        product = self.get_selected_product("view history")
+        if not product:
             return
+        product_name = product['name']
         
         # Create history window
         history_window = tk.Toplevel(self.root)
         history_window.title(f"Price History: {product_name}")
-        history_window.geometry("600x400")
+        history_window.geometry("600x450")
+        
+        # Summary stats, served from the analytics cache
+        stats = self.analytics.summary(product)
+        stats_frame = ttk.Frame(history_window)
+        stats_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        def money(value):
+            return f"${value:,.2f}" if value is not None else "N/A"
+        
+        stats_items = [
+            ("All-time Low", money(stats['all_time_low'])),
+            ("30-day Low", money(stats['low_30d'])),
+            ("90-day Low", money(stats['low_90d'])),
+            ("Average", money(stats['average'])),
+            ("Volatility", f"{stats['volatility']:.2f}%"),
+            ("Price Drops", f"{stats['drop_count']} (last {stats['last_drop'] or 'N/A'})")
+        ]
+        for i, (label, value) in enumerate(stats_items):
+            ttk.Label(stats_frame, text=f"{label}:", font=('Segoe UI', 9, 'bold')).grid(
+                row=i // 3, column=(i % 3) * 2, sticky=tk.W, padx=(0, 5), pady=2)
+            ttk.Label(stats_frame, text=value, font=('Segoe UI', 9)).grid(
+                row=i // 3, column=(i % 3) * 2 + 1, sticky=tk.W, padx=(0, 15), pady=2)
         
         # Create treeview
         tree_frame = ttk.Frame(history_window)
@@ -519,6 +1867,9 @@ class AmazonPriceTracker:
         history_tree.column("price", width=150, anchor=tk.CENTER)
         history_tree.column("change", width=150, anchor=tk.CENTER)
         
+        history_tree.tag_configure('drop', foreground='green')
+        history_tree.tag_configure('rise', foreground='red')
+        
         # Add scrollbar
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=history_tree.yview)
         history_tree.configure(yscroll=scrollbar.set)
@@ -526,68 +1877,165 @@ class AmazonPriceTracker:
         history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Sort history by date (newest first)
-        sorted_history = sorted(product['price_history'], 
-                              key=lambda x: datetime.strptime(x['date'], "%Y-%m-%d"), 
-                              reverse=True)
+        # Saved history plus the archive; the most recent observations only
+        timestamps, prices = self.get_history_range(product, float('-inf'), float('inf'))
+        entries = self.history_entries(timestamps, prices, max(len(prices) - HISTORY_WINDOW_ROWS, 0), len(prices))
         
-        # Add data to treeview
-        for i, record in enumerate(sorted_history):
-            price = f"${record['price']:,.2f}"
+        # Add data to treeview, newest first
+        for entry in reversed(entries):
+            price = f"${entry['price']:,.2f}"
+            change = entry['change']
             
-            # Calculate change if there's a previous record
-            if i < len(sorted_history) - 1:
-                prev_price = sorted_history[i+1]['price']
-                change = record['price'] - prev_price
-                change_percent = (change / prev_price) * 100
-                change_text = f"{change:+.2f} ({change_percent:+.2f}%)"
+            if change is not None:
+                change_text = f"{change:+.2f} ({entry['change_percent']:+.2f}%)"
                 
                 if change < 0:
                     change_text = f"↓ {change_text}"
-                    tag = 'drop'
+                    tags = ('drop',)
                 else:
                     change_text = f"↑ {change_text}"
-                    tag = 'rise'
+                    tags = ('rise',)
             else:
                 change_text = "N/A"
-                tag = ''
+                tags = ()
             
-            # Insert with appropriate tags
-            item = history_tree.insert("", tk.END, values=(record['date'], price, change_text))
-            
-            # Color rows based on price changes
-            if tag == 'drop':
-                history_tree.tag_configure('drop', foreground='green')
-                history_tree.item(item, tags=('drop',))
-            elif tag == 'rise':
-                history_tree.tag_configure('rise', foreground='red')
-                history_tree.item(item, tags=('rise',))
+            history_tree.insert("", tk.END, values=(entry['date'], price, change_text), tags=tags)
+    
+    def show_price_chart(self):
+        product = self.get_selected_product("chart")
+        if not product:
+            return
+        
+        chart_window = tk.Toplevel(self.root)
+        chart_window.title(f"Price Chart: {product['name']}")
+        chart_window.geometry("800x450")
+        
+        chart_frame = ttk.Frame(chart_window, padding=10)
+        chart_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(chart_frame, text="Scroll to zoom, drag to pan, double-click to reset",
+                  font=('Segoe UI', 9), foreground="#666666").pack(anchor=tk.W, pady=(0, 5))
+        
+        PriceChart(chart_frame, self, product)
     
     def refresh_prices(self):
-        if not self.tracked_products:
+        if not len(self.store):
             messagebox.showinfo("Info", "No products to refresh", parent=self.root)
             return
         
+        # The sweep runs on the monitor thread, which refreshes the tree when done
         self.status_var.set("Refreshing prices... | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        self.root.update()
+        self.check_now()
+    
+    def check_now(self):
+        # Sweep right away, even while paused
+        self.monitor_commands.put('check')
+    
+    def pause_monitoring(self):
+        self.monitor_paused = True
+        self.monitor_commands.put('pause')
+        self.events.publish('monitor_state', {'paused': True})
+        self.root.after(0, self.update_monitor_controls)
+    
+    def resume_monitoring(self):
+        self.monitor_paused = False
+        self.monitor_commands.put('resume')
+        self.events.publish('monitor_state', {'paused': False})
+        self.root.after(0, self.update_monitor_controls)
+    
+    def toggle_monitoring(self):
+        if self.monitor_paused:
+            self.resume_monitoring()
+        else:
+            self.pause_monitoring()
+    
+    def update_monitor_controls(self):
+        if self.monitor_paused:
+            self.pause_button.configure(text="▶ Resume Monitoring")
+            self.status_var.set("Monitoring paused | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        else:
+            self.pause_button.configure(text="⏸ Pause Monitoring")
+            self.status_var.set("Monitoring prices... | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    
+    def check_all_prices(self):
+        # Check every product on the fetch pool (each check only locks its own
+        # product) and return the sweep's changes as one batch
+        product_ids = [p['id'] for p in self.store.snapshot()]
+        try:
+            futures = [self.fetch_pool.submit(self.check_price, product_id) for product_id in product_ids]
+        except RuntimeError:
+            return []  # The pool has been shut down
+        wait(futures)
+        return [change for future in futures for change in future.result()]
+    
+    def check_price(self, product_id):
+        # Safe to call from any thread. The store hands apply_price_check a
+        # private copy of the product; the changes it found are returned.
+        if self.stop_event.is_set():
+            return []  # Shutting down: skip checks that haven't started yet
+        
+        changes = []
+        with self.inflight_changed:
+            self.inflight_checks += 1
+        try:
+            product = self.store.update(product_id,
+                                        lambda product: changes.extend(self.apply_price_check(product)),
+                                        event_type=None)
+            if product is None:
+                return []  # Removed mid-check: the copy was thrown away, so is the check
+            if not product['status'].startswith("Error"):
+                # Archived only once the check has landed in the store
+                self.record_observation(product)
+        finally:
+            with self.inflight_changed:
+                self.inflight_checks -= 1
+                self.inflight_changed.notify_all()
+        return changes
+    
+    def record_observation(self, product):
+        timestamp = time.time()
+        if self.observation_log:
+            self.observation_log.append(product['id'], timestamp, product['current_price'])
+        self.analytics.observe(product['id'], timestamp, product['current_price'])
+    
+    def process_changes(self, changes):
+        # Hand a sweep's changes to the journal, the GUI, API clients and the
+        # notifiers. Each of them only sees the products that actually changed.
+        if not changes:
+            return
         
-        for product in self.tracked_products:
-            self.check_price(product)
+        changed_ids = dict.fromkeys(change.product_id for change in changes)
+        products = [p for p in (self.store.get(product_id) for product_id in changed_ids) if p]
         
-        self.update_products_tree()
-        self.status_var.set("Prices refreshed | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.append_journal(products)
+        self.events.publish('changes', [change._asdict() for change in changes])
+        
+        # Tk widgets may only be touched from the GUI thread
+        self.root.after(0, self.update_product_rows, products)
+        for change in changes:
+            if change.kind == CHANGE_TARGET_CROSSED:
+                product = self.store.get(change.product_id)
+                if product:
+                    self.root.after(0, self.show_alert, product)
     
-    def check_price(self, product):
+    def apply_price_check(self, product):
+        # Updates product in place and returns the ChangeEvents it caused
+        product_id = product['id']
+        old_price = product['current_price']
+        old_status = product.get('status')
+        changes = []
+        
         try:
+            previous_low = self.analytics.summary(product)['all_time_low']
+            
             # Generate random fluctuation in price (between -5% and +5%)
             fluctuation = random.uniform(-0.05, 0.05)
             new_price = product['current_price'] * (1 + fluctuation)
             
             # Occasionally simulate a price drop (10% chance)
             if random.random() < 0.1:
-                drop_percent = random.uniform(0.1, 0.3)  # 10-30% drop
+                drop_percent = random.uniform(DROP_THRESHOLD, 0.3)  # 10-30% drop
                 new_price = product['current_price'] * (1 - drop_percent)
-                product['last_drop_date'] = datetime.now().strftime("%Y-%m-%d")
                 
                 # Record this drop in price history
                 product['price_history'].append({
@@ -597,29 +2045,48 @@ class AmazonPriceTracker:
                 })
             
             product['current_price'] = new_price
+            if new_price != old_price:
+                changes.append(ChangeEvent(CHANGE_PRICE_CHANGED, product_id, old_price, new_price))
             
-            # Update lowest price if needed
-            if new_price < product['lowest_price']:
-                product['lowest_price'] = new_price
+            # check_price archives the new price once this copy is in the store
+            if previous_low is None or new_price < previous_low:
+                changes.append(ChangeEvent(CHANGE_NEW_LOW, product_id, previous_low, new_price))
             
-            # Check if price dropped below target
-            if new_price <= product['target_price']:
+            # Check if price dropped below target. Only crossing the target in
+            # either direction is a change; staying below it is not.
+            target_price = product['target_price']
+            if new_price <= target_price:
                 product['status'] = "Target Reached!"
-                self.show_alert(product)
+                if old_price > target_price:
+                    changes.append(ChangeEvent(CHANGE_TARGET_CROSSED, product_id, old_price, new_price))
             else:
                 product['status'] = "Tracking"
+                if old_price <= target_price:
+                    changes.append(ChangeEvent(CHANGE_TARGET_RECOVERED, product_id, old_price, new_price))
             
             product['last_checked'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         except Exception as e:
             product['status'] = f"Error: {str(e)}"
             product['last_checked'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if product['status'] != old_status:
+                changes.append(ChangeEvent(CHANGE_ERROR, product_id, old_status, product['status']))
+        
+        return changes
     
     def show_alert(self, product):
+        stats = self.analytics.summary(product)
+        low_30d = stats['low_30d']
+        low_30d_text = f"${low_30d:,.2f}" if low_30d is not None else "N/A"
         message = f"🎉 Price alert for {product['name']}!\n\n" \
                  f"💰 Current Price: ${product['current_price']:,.2f}\n" \
                  f"🎯 Target Price: ${product['target_price']:,.2f}\n" \
-                 f"📉 Last Price Drop: {product.get('last_drop_date', 'N/A')}"
+                 f"📊 30-day Low: {low_30d_text}\n" \
+                 f"📉 Last Price Drop: {stats['last_drop'] or 'N/A'}"
+        
+        alert = serialize_product(product, ['id', 'name', 'current_price', 'target_price'])
+        alert['last_drop'] = stats['last_drop']
+        self.events.publish('alert', alert)
         
         # Show in GUI with flashing effect
         self.flashing_alert = True
@@ -698,50 +2165,82 @@ class AmazonPriceTracker:
         window.destroy()
     
     def monitor_prices(self):
-        while self.monitoring_active:
-            for product in self.tracked_products:
-                self.check_price(product)
+        next_sweep = time.monotonic()
+        while True:
+            # Wait until the next sweep is due (forever while paused) or a command arrives
+            timeout = None if self.monitor_paused else max(next_sweep - time.monotonic(), 0)
+            try:
+                command = self.monitor_commands.get(timeout=timeout)
+            except queue.Empty:
+                command = 'sweep'
             
-            # Update GUI
-            self.root.after(0, self.update_products_tree)
+            if command == 'stop':
+                break
+            if command not in ('sweep', 'check'):
+                continue  # pause/resume only change how long we wait
             
-            # Update status with current time
-            self.root.after(0, lambda: self.status_var.set(
-                "Monitoring prices... | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            changes = self.check_all_prices()
+            if self.stop_event.is_set():
+                # Shutting down: don't touch Tk (root.after would block until the
+                # GUI thread, which is waiting on us, services it). on_close saves
+                # the store, so the sweep's results aren't lost.
+                break
+            self.process_changes(changes)
+            if self.observation_log:
+                self.observation_log.flush()
+            next_sweep = time.monotonic() + CHECK_INTERVAL
             
-            # Wait before next check (e.g., every 30 minutes)
-            time.sleep(1800)
+            # Update status with current time
+            self.root.after(0, lambda count=len(changes): self.status_var.set(
+                ("Monitoring paused" if self.monitor_paused else "Monitoring prices...") +
+                f" | {count} changes | " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    
+    def product_row(self, product):
+        # Treeview values and tags for one product. Lowest price and last drop
+        # come from the (memoized) analytics.
+        stats = self.analytics.summary(product)
+        last_drop = stats['last_drop'] or 'N/A'
+        
+        # Format prices with commas for thousands
+        current_price = f"${product.get('current_price', 0):,.2f}"
+        lowest_price = f"${stats['all_time_low']:,.2f}" if stats['all_time_low'] is not None else "N/A"
+        target_price = f"${product.get('target_price', 0):,.2f}"
+        
+        values = (
+            product.get('name', 'Unknown'),
+            current_price,
+            lowest_price,
+            target_price,
+            last_drop,
+            product.get('status', 'Pending'),
+            product.get('url', '')
+        )
+        
+        tags = ()
+        
+        # Highlight rows where target price is reached
+        if product.get('status') == "Target Reached!":
+            tags = ('target_reached',)
+        
+        # Highlight rows with recent price drops
+        if last_drop == datetime.now().strftime("%Y-%m-%d"):
+            tags = ('price_drop',)
+        
+        return values, tags
     
     def update_products_tree(self):
         self.products_tree.delete(*self.products_tree.get_children())
         
-        for product in self.tracked_products:
-            # Format prices with commas for thousands
-            current_price = f"${product.get('current_price', 0):,.2f}"
-            lowest_price = f"${product.get('lowest_price', 0):,.2f}"
-            target_price = f"${product.get('target_price', 0):,.2f}"
-            
-            values = (
-                product.get('name', 'Unknown'),
-                current_price,
-                lowest_price,
-                target_price,
-                product.get('last_drop_date', 'N/A'),
-                product.get('status', 'Pending'),
-                product.get('url', '')
-            )
-            
-            item = self.products_tree.insert("", tk.END, values=values)
-            
-            # Highlight rows where target price is reached
-            if product.get('status') == "Target Reached!":
-                self.products_tree.tag_configure('target_reached', background='#d4edda')
-                self.products_tree.item(item, tags=('target_reached',))
-            
-            # Highlight rows with recent price drops
-            if product.get('last_drop_date') == datetime.now().strftime("%Y-%m-%d"):
-                self.products_tree.tag_configure('price_drop', background='#fff3cd')
-                self.products_tree.item(item, tags=('price_drop',))
+        for product in self.store.snapshot():
+            values, tags = self.product_row(product)
+            self.products_tree.insert("", tk.END, iid=product['id'], values=values, tags=tags)
+    
+    def update_product_rows(self, products):
+        # Refresh just these rows in place instead of rebuilding the whole tree
+        for product in products:
+            if self.products_tree.exists(product['id']):
+                values, tags = self.product_row(product)
+                self.products_tree.item(product['id'], values=values, tags=tags)
     
     def load_data(self):
         # Load tracked products
@@ -749,14 +2248,42 @@ class AmazonPriceTracker:
             try:
                 with open('tracked_products.json', 'r') as f:
                     data = json.load(f)
+                    data = self.replay_journal(data)
                     # Convert price_history lists to deques
+                    backfilled_ids = False
                     for product in data:
+                        # Products saved before ids were introduced
+                        if 'id' not in product:
+                            product['id'] = uuid.uuid4().hex
+                            backfilled_ids = True
                         if 'price_history' in product:
                             product['price_history'] = deque(product['price_history'], maxlen=5)
-                    self.tracked_products = data
+                        # Lowest price and last drop come from the analytics now;
+                        # older files stored (partly made-up) copies of them
+                        product.pop('lowest_price', None)
+                        product.pop('last_drop_date', None)
+                    self.store.load(data)
+                
+                # Fold the journal into the main file straight away: a line torn
+                # by a crash would otherwise have the next session's records
+                # appended onto it. New ids are persisted the same way; the
+                # journal, the archive and API clients all refer to products by id.
+                if backfilled_ids or self.journal_lines:
+                    self.save_data()
             except Exception as e:
                 messagebox.showerror("Error", f"Could not load product data: {str(e)}", parent=self.root)
-                self.tracked_products = []
+                self.store.load([])
+        
+        # Saved price statistics are only a cache of the history, so a missing
+        # or unreadable file just means rebuilding them
+        if os.path.exists(STATS_FILE):
+            try:
+                with open(STATS_FILE, 'r') as f:
+                    states = json.load(f)
+                self.analytics.restore({product_id: state for product_id, state in states.items()
+                                        if self.store.get(product_id)})
+            except (OSError, ValueError, TypeError, AttributeError):
+                pass
         
         # Load user info
         if os.path.exists('user_info.json'):
@@ -767,25 +2294,120 @@ class AmazonPriceTracker:
                 messagebox.showerror("Error", f"Could not load user info: {str(e)}", parent=self.root)
                 self.user_info = {'email': '', 'phone': ''}
     
+    def open_observation_log(self):
+        try:
+            self.observation_log = ObservationLog(OBSERVATION_DIR)
+        except (OSError, ValueError) as e:
+            # Tracking still works without the archive; only long-term history is lost
+            messagebox.showerror("Error", f"Could not open price archive: {str(e)}", parent=self.root)
+            self.observation_log = None
+    
+    def replay_journal(self, data):
+        # Apply product states journaled since the last full save
+        self.journal_lines = 0
+        if not os.path.exists(JOURNAL_FILE):
+            return data
+        
+        positions = {p.get('id'): i for i, p in enumerate(data)}
+        with open(JOURNAL_FILE, 'r') as f:
+            for line in f:
+                self.journal_lines += 1
+                try:
+                    product = json.loads(line)
+                except ValueError:
+                    continue  # Line torn by a crash mid-write
+                if isinstance(product, dict) and product.get('id') in positions:
+                    data[positions[product['id']]] = product
+        return data
+    
+    def append_journal(self, products):
+        if not products:
+            return
+        
+        try:
+            with self.save_lock:
+                with open(JOURNAL_FILE, 'a') as f:
+                    for product in products:
+                        f.write(json.dumps(serialize_product(product, list(product))) + "\n")
+                self.journal_lines += len(products)
+                compact = self.journal_lines >= JOURNAL_COMPACT_LINES
+        except Exception as e:
+            self.show_error(f"Could not save price changes: {str(e)}")
+            return
+        
+        if compact:
+            self.save_data()
+    
     def save_data(self):
         try:
-            with open('tracked_products.json', 'w') as f:
+            # Saves can come from the GUI, the API and the monitor at once, so
+            # serialize them and write via a temp file to never leave a torn file
+            with self.save_lock:
                 # Convert deques to lists for JSON serialization
                 data_to_save = []
-                for product in self.tracked_products:
+                for product in self.store.snapshot():
                     product_copy = product.copy()
                     if 'price_history' in product_copy:
                         product_copy['price_history'] = list(product_copy['price_history'])
                     data_to_save.append(product_copy)
-                json.dump(data_to_save, f, indent=2)
+                
+                with open('tracked_products.json.tmp', 'w') as f:
+                    json.dump(data_to_save, f, indent=2)
+                os.replace('tracked_products.json.tmp', 'tracked_products.json')
+                
+                # Statistics may lag the archive; analytics catch up on restore
+                with open(STATS_FILE + '.tmp', 'w') as f:
+                    json.dump(self.analytics.state(), f)
+                os.replace(STATS_FILE + '.tmp', STATS_FILE)
+                
+                # Everything journaled so far is now in the main file
+                open(JOURNAL_FILE, 'w').close()
+                self.journal_lines = 0
         except Exception as e:
-            messagebox.showerror("Error", f"Could not save product data: {str(e)}", parent=self.root)
+            self.show_error(f"Could not save product data: {str(e)}")
+    
+    def show_error(self, message):
+        # Saves also run on API and monitor threads, and Tk widgets may only be
+        # touched from the GUI thread
+        if threading.current_thread() is threading.main_thread():
+            messagebox.showerror("Error", message, parent=self.root)
+        else:
+            self.root.after(0, lambda: messagebox.showerror("Error", message, parent=self.root))
+    
+    def start_api_server(self):
+        try:
+            self.api_server = ThreadingHTTPServer((API_HOST, API_PORT), ApiRequestHandler)
+        except OSError as e:
+            # Another instance probably owns the port; the GUI still works without it
+            print(f"Remote API disabled: could not bind {API_HOST}:{API_PORT} ({e})")
+            return
+        
+        self.api_server.daemon_threads = True
+        self.api_server.tracker = self
+        threading.Thread(target=self.api_server.serve_forever, daemon=True).start()
     
     def on_close(self):
-        self.monitoring_active = False
+        deadline = time.monotonic() + SHUTDOWN_DEADLINE
+        
+        if self.api_server:
+            self.api_server.shutdown()
+            self.api_server.server_close()
+        
+        # Stop the monitor: queued checks return straight away, running ones may finish
+        self.stop_event.set()
+        self.monitor_commands.put('stop')
+        self.fetch_pool.shutdown(wait=False)
+        
+        # Let in-flight checks land in the store so the final save includes them
+        with self.inflight_changed:
+            self.inflight_changed.wait_for(lambda: self.inflight_checks == 0,
+                                           timeout=max(deadline - time.monotonic(), 0))
         if self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=1)
+            self.monitor_thread.join(timeout=max(deadline - time.monotonic(), 0))
+        
         self.save_data()  # Ensure data is saved before closing
+        if self.observation_log:
+            self.observation_log.close()
         self.root.destroy()
 
 if __name__ == "__main__":